@@ -0,0 +1,39 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+import "./MyToken.sol";
+import "./DataReview.sol";
+import "./DataBundle.sol";
+
+/**
+ * @title Deployer
+ * @dev One-shot factory that deploys MyToken, DataReview and DataBundle in a single
+ * transaction, so the marketplace is set up with one deployment and one receipt.
+ */
+contract Deployer {
+    MyToken public token;
+    DataReview public dataReview;
+    DataBundle public dataBundle;
+
+    // Emitted once with the addresses of all deployed contracts
+    event Deployed(address token, address dataReview, address dataBundle);
+
+    /**
+     * @dev Deploys the marketplace contracts and hands them over to the deployer.
+     * @param initialSupply The total supply of tokens to mint initially.
+     * @param deployer The account that receives the token supply and contract ownership.
+     */
+    constructor(uint256 initialSupply, address deployer) {
+        token = new MyToken(initialSupply);
+        dataReview = new DataReview(address(token), deployer);
+        dataBundle = new DataBundle(address(token), deployer);
+
+        // Contracts created here see this factory as msg.sender (OZ 4.x Ownable and
+        // MyToken's _mint both use it), so pass the supply and ownership on to the deployer.
+        token.transfer(deployer, initialSupply);
+        dataReview.transferOwnership(deployer);
+        dataBundle.transferOwnership(deployer);
+
+        emit Deployed(address(token), address(dataReview), address(dataBundle));
+    }
+}
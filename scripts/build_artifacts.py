@@ -0,0 +1,38 @@
+import msgpack
+import orjson
+import os
+
+# Contracts whose solcjs outputs are converted; Deployer is optional
+CONTRACT_NAMES = ["MyToken", "DataReview", "DataBundle", "Deployer"]
+
+def build_artifact(contract_name):
+    """
+    Converts build/contract_name.json (ABI) into build/contract_name.msgpack and
+    build/contract_name.bin (hex bytecode) into build/contract_name.binbytes (raw bytes).
+    deploy.py prefers these files, which skips JSON parsing and hex decoding on every run.
+    """
+    abi_path = f'build/{contract_name}.json'
+    bytecode_path = f'build/{contract_name}.bin'
+    if not (os.path.exists(abi_path) and os.path.exists(bytecode_path)):
+        print(f"Skipping {contract_name}: '{abi_path}' or '{bytecode_path}' not found.")
+        return
+
+    with open(abi_path, 'rb') as f:
+        abi = orjson.loads(f.read())
+    with open(f'build/{contract_name}.msgpack', 'wb') as f:
+        f.write(msgpack.packb(abi))
+
+    with open(bytecode_path, 'r') as f:
+        bytecode = bytes.fromhex(f.read().strip().removeprefix('0x'))
+    with open(f'build/{contract_name}.binbytes', 'wb') as f:
+        f.write(bytecode)
+    print(f"SUCCESS: Wrote build/{contract_name}.msgpack and build/{contract_name}.binbytes")
+
+def main():
+    print("--- Building Binary Contract Artifacts ---")
+    for contract_name in CONTRACT_NAMES:
+        build_artifact(contract_name)
+    print("--- Binary Contract Artifacts Built ---")
+
+if __name__ == "__main__":
+    main()
@@ -1,151 +1,515 @@
-from web3 import Web3
+from web3 import AsyncWeb3, AsyncHTTPProvider, WebSocketProvider
+from web3.logs import DISCARD
+from eth_account import Account
+import aiohttp
+import argparse
+import asyncio
+import functools
+import hashlib
 import json
+import logging
+import logging.handlers
+import orjson
 import os
-import time # Import time for delays
-
-# Connect to Ganache (default address and port)
-w3 = Web3(Web3.HTTPProvider('http://127.0.0.1:8545'))
-
-# Set the default account for transactions to the first account provided by Ganache
-w3.eth.default_account = w3.eth.accounts[0]
-print(f"Connecting to Ganache at http://127.0.0.1:8545...")
-if not w3.is_connected():
-    print("Error: Not connected to Ganache. Please ensure ganache-cli is running.")
-    exit()
-print(f"Successfully connected to Ganache. Client version: {w3.client_version}")
-print(f"Using deployer account: {w3.eth.default_account}")
-print(f"Current block number: {w3.eth.block_number}")
-print(f"Chain ID: {w3.eth.chain_id}")
+import pickle
+import sys
+import tempfile
+
+log = logging.getLogger(__name__)
+
+class DeploymentError(Exception):
+    """
+    Raised when deployment cannot continue. The cause has already been logged;
+    __main__ turns it into exit status 1.
+    """
+
+# Ganache endpoints (default address and port). Ganache serves HTTP and WebSocket on the same port.
+GANACHE_HTTP_URL = 'http://127.0.0.1:8545'
+GANACHE_WS_URL = 'ws://127.0.0.1:8545'
+
+# Async Web3 instance, created by connect().
+# The async provider lets independent deployments be in flight at the same time.
+w3 = None
+
+# Account that signs deployments locally, loaded from the PRIVATE_KEY environment variable.
+# Without it, transactions are sent from (and signed by) Ganache's first unlocked account.
+signer = None
+# Nonce, gas price and chain id for locally signed transactions, fetched once by connect()
+_next_nonce = None
+_gas_price = None
+_chain_id = None
+
+def _startup_probes():
+    """
+    Returns the requests connect() sends to Ganache in its startup batch.
+    Only w3.eth Methods can be batched; AsyncWeb3.client_version is a plain coroutine
+    property that would be sent on its own, so it is fetched separately.
+    """
+    probes = [w3.eth.accounts, w3.eth.block_number, w3.eth.chain_id]
+    if signer is not None:
+        # The nonce is fetched once here and then incremented locally for each deployment
+        probes += [w3.eth.get_transaction_count(signer.address, 'pending'), w3.eth.gas_price]
+    return probes
+
+async def connect(use_http=False):
+    """
+    Connects to Ganache and sets the default account for transactions
+    to the PRIVATE_KEY account, or the first account provided by Ganache.
+    WebSocket is used by default so all RPCs share one persistent connection;
+    use_http switches to the HTTP provider with a keep-alive session.
+    """
+    global w3, signer, _next_nonce, _gas_price, _chain_id
+    if os.getenv('PRIVATE_KEY'):
+        signer = Account.from_key(os.environ['PRIVATE_KEY'])
+    if use_http:
+        log.info(f"Connecting to Ganache at {GANACHE_HTTP_URL}...")
+        w3 = AsyncWeb3(AsyncHTTPProvider(GANACHE_HTTP_URL, request_kwargs={'timeout': aiohttp.ClientTimeout(total=30)}))
+        # Reuse one pool of keep-alive connections for every RPC instead of reconnecting per request
+        session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=32, keepalive_timeout=60))
+        await w3.provider.cache_async_session(session)
+    else:
+        log.info(f"Connecting to Ganache at {GANACHE_WS_URL}...")
+        # A single connection attempt, so a missing Ganache is reported immediately
+        # instead of after the provider's default retries with backoff
+        w3 = AsyncWeb3(WebSocketProvider(GANACHE_WS_URL, max_connection_retries=1))
+        try:
+            await w3.provider.connect()
+        except Exception as e:
+            log.error(f"Error: Could not open WebSocket connection ({e}). Please ensure ganache-cli is running, or retry with --http.")
+            raise DeploymentError("Could not connect to Ganache.")
+    # These probes are independent of each other, so send them as one JSON-RPC batch.
+    # They double as the connectivity check, so no separate is_connected() round trip is made.
+    try:
+        async with w3.batch_requests() as batch:
+            for probe in _startup_probes():
+                batch.add(probe)
+            results = await batch.async_execute()
+        client_version = await w3.client_version
+    except (ConnectionError, aiohttp.ClientError):
+        log.error("Error: Not connected to Ganache. Please ensure ganache-cli is running.")
+        raise DeploymentError("Could not connect to Ganache.")
+    accounts, block_number, chain_id, *signer_state = results
+    if signer is not None:
+        _next_nonce, _gas_price = signer_state
+        _chain_id = chain_id
+        w3.eth.default_account = signer.address
+    else:
+        w3.eth.default_account = accounts[0]
+    log.info(f"Successfully connected to Ganache. Client version: {client_version}")
+    log.info(f"Using deployer account: {w3.eth.default_account}")
+    log.info(f"Current block number: {block_number}")
+    log.info(f"Chain ID: {chain_id}")
+
+# Process umask, read once at startup (os.umask can only be queried by setting it, which is not thread-safe)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+def atomic_write_json(path, obj):
+    """
+    Writes obj as JSON to path via a synced temporary file and os.replace,
+    so readers never see a half-written file if the script is interrupted.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.')
+    try:
+        try:
+            # mkstemp creates the file as 0600; give it the usual umask-derived mode like open() would
+            os.fchmod(fd, 0o666 & ~_UMASK)
+            data = memoryview(json.dumps(obj, indent=4).encode())
+            while data: # os.write may write fewer bytes than requested
+                data = data[os.write(fd, data):]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+    except BaseException:
+        # Never leave a stray temporary file behind, whichever step failed
+        os.unlink(tmp_path)
+        raise
+
+# On-disk cache of parsed artifacts, keyed by (contract_name, bytecode file mtime, ABI file mtime)
+ARTIFACT_CACHE_PATH = 'build/.cache.pkl'
+use_artifact_cache = True # Disabled with --no-cache
 
 # Function to load compiled contract ABI and Bytecode
 def load_contract_artifact(contract_name):
     """
     Loads the ABI from contract_name.json and bytecode from contract_name.bin
     for a given contract from the 'build/' directory.
+    The binary .msgpack/.binbytes artifacts written by build_artifacts.py are preferred when present.
+    Artifacts are read and parsed only once per contract; repeated calls are served from cache.
+    The bytecode is returned as bytes.
     """
-    abi_path = f'build/{contract_name}.json'
-    bytecode_path = f'build/{contract_name}.bin' # Path to the .bin file
+    abi, bytecode = _load_artifact(contract_name)
+    return list(abi), bytecode
 
-    print(f"\n--- Loading Artifacts for {contract_name} ---")
-    print(f"Attempting to load ABI from: {abi_path}")
+@functools.lru_cache(maxsize=None)
+def _load_artifact(contract_name):
+    """
+    Reads and parses the build/ artifacts for contract_name exactly once.
+    The ABI is returned as a tuple so the cached value cannot be mutated by callers.
+    Unless --no-cache is given, unchanged artifacts are served from ARTIFACT_CACHE_PATH.
+    """
+    abi_path = _pick_artifact(f'build/{contract_name}.msgpack', f'build/{contract_name}.json')
+    bytecode_path = _pick_artifact(f'build/{contract_name}.binbytes', f'build/{contract_name}.bin') # Path to the .bin file
+
+    cache_key = None
+    if use_artifact_cache:
+        try:
+            cache_key = (contract_name, os.path.getmtime(bytecode_path), os.path.getmtime(abi_path))
+        except OSError:
+            pass # Missing files are reported below
+        else:
+            cached = _read_artifact_cache().get(cache_key)
+            if cached is not None:
+                log.info(f"Loaded artifacts for {contract_name} from {ARTIFACT_CACHE_PATH}.")
+                return cached
+
+    log.info(f"--- Loading Artifacts for {contract_name} ---")
+    log.info(f"Attempting to load ABI from: {abi_path}")
     try:
-        with open(abi_path, 'r') as f:
-            abi = json.load(f)
-        print(f"SUCCESS: Loaded ABI for {contract_name}.")
+        with open(abi_path, 'rb') as f:
+            if abi_path.endswith('.msgpack'):
+                import msgpack # Only needed for the optional binary artifacts
+                abi = msgpack.unpackb(f.read(), raw=False)
+            else:
+                abi = orjson.loads(f.read())
+        log.info(f"SUCCESS: Loaded ABI for {contract_name}.")
     except FileNotFoundError:
-        print(f"ERROR: ABI file '{abi_path}' not found in build/ directory.")
-        print("Please ensure you have compiled your Solidity contracts and renamed the .abi files to .json.")
-        exit()
-    except json.JSONDecodeError:
-        print(f"ERROR: Could not parse JSON from '{abi_path}'. Is it a valid JSON file?")
-        exit()
-
-    print(f"Attempting to load Bytecode from: {bytecode_path}")
+        log.error(f"ERROR: ABI file '{abi_path}' not found in build/ directory.")
+        log.error("Please ensure you have compiled your Solidity contracts and renamed the .abi files to .json.")
+        raise DeploymentError(f"Could not load artifacts for {contract_name}.")
+    except ValueError: # orjson.JSONDecodeError and msgpack's unpacking errors are ValueErrors
+        log.error(f"ERROR: Could not parse ABI from '{abi_path}'. Is it a valid artifact file?")
+        raise DeploymentError(f"Could not load artifacts for {contract_name}.")
+
+    log.info(f"Attempting to load Bytecode from: {bytecode_path}")
     try:
-        with open(bytecode_path, 'r') as f:
-            bytecode = f.read().strip()
-        print(f"SUCCESS: Loaded bytecode for {contract_name}.")
+        if bytecode_path.endswith('.binbytes'):
+            with open(bytecode_path, 'rb') as f:
+                bytecode = f.read()
+        else:
+            with open(bytecode_path, 'r') as f:
+                bytecode = bytes.fromhex(f.read().strip().removeprefix('0x'))
+        log.info(f"SUCCESS: Loaded bytecode for {contract_name}.")
     except FileNotFoundError:
-        print(f"ERROR: Bytecode file '{bytecode_path}' not found in build/ directory.")
-        print("Please ensure you have compiled your Solidity contracts and the .bin files are present and correctly named.")
-        exit()
-    print(f"--- Finished Loading Artifacts for {contract_name} ---\n")
-    return abi, bytecode
+        log.error(f"ERROR: Bytecode file '{bytecode_path}' not found in build/ directory.")
+        log.error("Please ensure you have compiled your Solidity contracts and the .bin files are present and correctly named.")
+        raise DeploymentError(f"Could not load artifacts for {contract_name}.")
+    except ValueError:
+        log.error(f"ERROR: Could not decode hex bytecode from '{bytecode_path}'. Is it a valid .bin file?")
+        raise DeploymentError(f"Could not load artifacts for {contract_name}.")
+    log.info(f"--- Finished Loading Artifacts for {contract_name} ---")
+
+    artifact = (tuple(abi), bytecode)
+    if cache_key is not None:
+        _write_artifact_cache(cache_key, artifact)
+    return artifact
+
+def _pick_artifact(binary_path, source_path):
+    """
+    Returns binary_path (written by build_artifacts.py) if it exists and is at least as new
+    as source_path, otherwise source_path. Stale binary artifacts are skipped with a warning.
+    """
+    try:
+        binary_mtime = os.path.getmtime(binary_path)
+    except OSError:
+        return source_path
+    try:
+        if binary_mtime < os.path.getmtime(source_path):
+            log.warning(f"WARNING: '{binary_path}' is older than '{source_path}'; ignoring it. Re-run scripts/build_artifacts.py to refresh it.")
+            return source_path
+    except OSError:
+        pass # Only the binary artifact exists
+    return binary_path
+
+@functools.lru_cache(maxsize=None)
+def _read_artifact_cache():
+    """
+    Loads the on-disk artifact cache once per run. A missing or unreadable cache is treated as empty.
+    """
+    try:
+        with open(ARTIFACT_CACHE_PATH, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return {}
+
+def _write_artifact_cache(cache_key, artifact):
+    """
+    Stores a freshly parsed artifact, dropping stale entries for the same contract.
+    """
+    cache = _read_artifact_cache()
+    for key in [key for key in cache if key[0] == cache_key[0]]:
+        del cache[key]
+    cache[cache_key] = artifact
+    try:
+        with open(ARTIFACT_CACHE_PATH, 'wb') as f:
+            pickle.dump(cache, f)
+    except OSError as e:
+        log.warning(f"WARNING: Could not write artifact cache '{ARTIFACT_CACHE_PATH}': {e}")
+
+# gasUsed of previous deployments, keyed by sha256 of the bytecode and constructor argument types
+GAS_CACHE_PATH = 'build/.gas_cache.json'
+use_gas_cache = True # Disabled with --fresh-gas
+
+@functools.lru_cache(maxsize=None)
+def _read_gas_cache():
+    """
+    Loads the gas cache once per run. A missing or unreadable cache is treated as empty.
+    """
+    try:
+        with open(GAS_CACHE_PATH, 'r') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
 
-def deploy_contract(contract_name, abi, bytecode, *args): # Added contract_name parameter
+def _record_gas_used(gas_key, gas_used):
+    """
+    Stores the gasUsed of a successful deployment for later runs.
+    """
+    cache = _read_gas_cache()
+    cache[gas_key] = gas_used
+    try:
+        atomic_write_json(GAS_CACHE_PATH, cache)
+    except OSError as e:
+        log.warning(f"WARNING: Could not write gas cache '{GAS_CACHE_PATH}': {e}")
+
+def contract_factory(abi, bytecode):
+    """
+    Returns the web3 contract class for an ABI and bytecode pair.
+    Instantiate it with address=... to get a contract bound to a deployment.
+    """
+    return _contract_factory(orjson.dumps(abi), bytecode)
+
+@functools.lru_cache(maxsize=32)
+def _contract_factory(abi_json, bytecode):
+    """
+    Builds each contract class (and its function/event selector tables) only once.
+    """
+    return w3.eth.contract(abi=orjson.loads(abi_json), bytecode=bytecode)
+
+async def deploy_contract(contract_name, abi, bytecode, *args): # Added contract_name parameter
     """
     Deploys a Solidity contract to the connected blockchain.
     """
-    Contract = w3.eth.contract(abi=abi, bytecode=bytecode)
-    print(f"Attempting to deploy contract '{contract_name}' with constructor args: {args}") # Use passed contract_name
+    tx_receipt = await send_deployment(contract_name, abi, bytecode, *args)
+    return contract_factory(abi, bytecode)(address=tx_receipt.contractAddress)
+
+async def send_signed_deployment(constructor, tx_params):
+    """
+    Signs a deployment locally with the PRIVATE_KEY account and sends it via eth_sendRawTransaction.
+    Nonce, gas price and chain id come from connect(), so at most one gas estimate RPC is made here.
+    """
+    global _next_nonce
+    tx_params = dict(tx_params)
+    if 'gas' not in tx_params:
+        # Estimate without a nonce: under concurrent deployments our nonce may be ahead of the
+        # node's pending count, and some nodes reject estimates for such future nonces.
+        estimated_gas = await constructor.estimate_gas({'from': signer.address})
+        tx_params['gas'] = estimated_gas + 100000 # Add a buffer
+        log.info(f"Estimated gas for deployment: {estimated_gas}. Using {tx_params['gas']} gas.")
+    # Take the nonce only after the estimate, with no await between read and increment,
+    # so concurrent deployments get distinct nonces
+    tx_params.update(nonce=_next_nonce, gasPrice=_gas_price, chainId=_chain_id)
+    _next_nonce += 1
+    # Every field is filled in, so build_transaction only encodes the constructor call
+    tx = await constructor.build_transaction(tx_params)
+    signed = signer.sign_transaction(tx)
+    return await w3.eth.send_raw_transaction(signed.raw_transaction)
+
+async def send_deployment(contract_name, abi, bytecode, *args):
+    """
+    Sends the deployment transaction for a contract and waits for it to be mined.
+    Returns the transaction receipt; raises DeploymentError if the deployment fails.
+    """
+    Contract = contract_factory(abi, bytecode)
+    log.info(f"Attempting to deploy contract '{contract_name}' with constructor args: {args}") # Use passed contract_name
     try:
-        # Build transaction to estimate gas more accurately
-        tx_build = Contract.constructor(*args).build_transaction({'from': w3.eth.default_account})
-        estimated_gas = w3.eth.estimate_gas(tx_build)
-        # Add a buffer to the estimated gas for more reliability
-        tx_build['gas'] = estimated_gas + 100000 # Add 100k gas buffer
-        print(f"Estimated gas for deployment: {estimated_gas}. Using {tx_build['gas']} gas.")
-
-        tx_hash = w3.eth.send_transaction(tx_build)
-        print(f"Deployment transaction sent. Hash: {tx_hash.hex()}")
-        print("Waiting for transaction to be mined...")
-        tx_receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+        # If this bytecode has been deployed before (in this or an earlier run), reuse its gasUsed
+        # plus a buffer and skip estimation entirely. Otherwise the node's estimate gets the same buffer.
+        tx_params = {'from': w3.eth.default_account}
+        constructor_types = [inp['type'] for entry in abi if entry['type'] == 'constructor' for inp in entry['inputs']]
+        gas_key = hashlib.sha256(bytecode + ','.join(constructor_types).encode()).hexdigest()
+        cached_gas = _read_gas_cache().get(gas_key) if use_gas_cache else None
+        if cached_gas is not None:
+            tx_params['gas'] = cached_gas + 100000 # Add 100k gas buffer
+            log.info(f"Reusing gas from previous deployment. Using {tx_params['gas']} gas.")
+        elif use_gas_cache:
+            log.info("No previous deployment of this bytecode; letting the node estimate gas.")
+        else:
+            log.info("--fresh-gas given; letting the node estimate gas.")
+
+        constructor = Contract.constructor(*args)
+        if signer is not None:
+            tx_hash = await send_signed_deployment(constructor, tx_params)
+        else:
+            if 'gas' not in tx_params:
+                estimated_gas = await constructor.estimate_gas(tx_params)
+                tx_params['gas'] = estimated_gas + 100000 # Add 100k gas buffer
+                log.info(f"Estimated gas for deployment: {estimated_gas}. Using {tx_params['gas']} gas.")
+            tx_hash = await constructor.transact(tx_params)
+        log.info(f"Deployment transaction sent. Hash: {w3.to_hex(tx_hash)}")
+        log.info(f"Waiting for '{contract_name}' deployment to be mined...")
+        # web3.py polls for the receipt over both WebSocket and HTTP; poll every 50ms rather than the default interval
+        tx_receipt = await w3.eth.wait_for_transaction_receipt(tx_hash, poll_latency=0.05)
         
         if tx_receipt.status == 0:
-            print(f"!!! ERROR: Contract deployment transaction reverted. Hash: {tx_hash.hex()}")
-            print(f"Transaction receipt: {tx_receipt}")
+            log.error(f"!!! ERROR: Contract deployment transaction reverted. Hash: {w3.to_hex(tx_hash)}")
+            log.error(f"Transaction receipt: {tx_receipt}")
             # Attempt to get revert reason (Ganache specific)
             try:
-                trace = w3.manager.request_blocking("debug_traceTransaction", [tx_hash.hex()])
+                # Only returnValue is needed, so skip the per-step stack, memory and storage dumps
+                trace = await w3.manager.coro_request("debug_traceTransaction", [w3.to_hex(tx_hash), {'disableStack': True, 'disableMemory': True, 'disableStorage': True}])
                 if 'returnValue' in trace and trace['returnValue']:
                     revert_data = trace['returnValue']
                     if revert_data.startswith('0x08c379a0'): # Selector for Error(string)
                         revert_reason = bytes.fromhex(revert_data[10:]).decode('utf-8', errors='ignore').strip('\x00')
-                        print(f"Ganache Revert Reason: {revert_reason}")
+                        log.error(f"Ganache Revert Reason: {revert_reason}")
                     else:
-                        print(f"Ganache Raw Revert Data: {revert_data}")
+                        log.error(f"Ganache Raw Revert Data: {revert_data}")
                 elif 'error' in trace and 'message' in trace['error']:
-                    print(f"Ganache Error Message: {trace['error']['message']}")
+                    log.error(f"Ganache Error Message: {trace['error']['message']}")
             except Exception as trace_e:
-                print(f"Could not trace transaction for revert reason: {trace_e}")
+                log.error(f"Could not trace transaction for revert reason: {trace_e}")
             raise Exception("Contract deployment failed due to revert.")
         
+        _record_gas_used(gas_key, tx_receipt.gasUsed)
         contract_address = tx_receipt.contractAddress
-        print(f"SUCCESS: Contract deployed at: {contract_address} (Block: {tx_receipt.blockNumber})")
-        return w3.eth.contract(address=contract_address, abi=abi)
+        log.info(f"SUCCESS: Contract deployed at: {contract_address} (Block: {tx_receipt.blockNumber})")
+        return tx_receipt
     except Exception as e:
-        print(f"FATAL ERROR: Failed to deploy contract. Details: {e}")
-        exit(1) # Exit script on fatal deployment error
-
-def main():
-    print("\n--- Starting Full Contract Deployment Process ---")
-    
-    # 1. Deploy MyToken (ERC-20)
-    print("\n[STEP 1/3] Deploying MyToken (ERC-20) contract...")
+        log.error(f"FATAL ERROR: Failed to deploy contract '{contract_name}'. Details: {e}")
+        raise DeploymentError(f"Failed to deploy contract '{contract_name}'.") from e
+
+async def verify_deployment(token_contract, data_review_contract, data_bundle_contract):
+    """
+    Reads back token supply, deployer balance and contract owners after deployment.
+    All getters are sent to the node as one JSON-RPC batch (one HTTP round trip).
+    """
+    log.info("--- Verifying Deployed Contracts ---")
+    calls = [
+        token_contract.functions.totalSupply(),
+        token_contract.functions.balanceOf(w3.eth.default_account),
+        data_review_contract.functions.owner(),
+        data_bundle_contract.functions.owner(),
+    ]
+    async with w3.batch_requests() as batch:
+        for call in calls:
+            batch.add(call)
+        total_supply, deployer_balance, review_owner, bundle_owner = await batch.async_execute()
+    log.info(f"MyToken total supply: {w3.from_wei(total_supply, 'ether')} MTK")
+    log.info(f"Deployer's MTK balance: {w3.from_wei(deployer_balance, 'ether')} MTK")
+    log.info(f"DataReview owner: {review_owner}")
+    log.info(f"DataBundle owner: {bundle_owner}")
+
+async def deploy_separately(initial_supply):
+    """
+    Deploys MyToken, DataReview and DataBundle as three separate transactions.
+    """
+    # 1. Deploy MyToken (ERC-20). The other two contracts need its address, so it goes first.
+    log.info("[STEP 1/2] Deploying MyToken (ERC-20) contract...")
     token_abi, token_bytecode = load_contract_artifact("MyToken")
-    initial_supply = 1_000_000 * (10**18) # 1 Million tokens with 18 decimals
-    token_contract = deploy_contract("MyToken", token_abi, token_bytecode, initial_supply) # Pass "MyToken" as name
-    print(f"MyToken deployed successfully at: {token_contract.address}")
-    print(f"MyToken total supply: {w3.from_wei(token_contract.functions.totalSupply().call(), 'ether')} MTK")
-    print(f"Deployer's MTK balance: {w3.from_wei(token_contract.functions.balanceOf(w3.eth.default_account).call(), 'ether')} MTK")
-    time.sleep(1) # Small delay for readability
-
-    # 2. Deploy DataReview contract, passing the deployed token's address AND the deployer as owner
-    print("\n[STEP 2/3] Deploying DataReview contract...")
-    data_review_abi, data_review_bytecode = load_contract_artifact("DataReview")
-    # Pass token_contract.address and w3.eth.default_account (deployer) as initial owner for Ownable
+    token_contract = await deploy_contract("MyToken", token_abi, token_bytecode, initial_supply) # Pass "MyToken" as name
+    log.info(f"MyToken deployed successfully at: {token_contract.address}")
+
+    # 2. Deploy DataReview and DataBundle concurrently; they only depend on the token address.
+    # Both receive token_contract.address and w3.eth.default_account (deployer) as initial owner for Ownable.
     # Note: For OZ 4.x, Ownable's constructor doesn't take _initialOwner. It defaults to msg.sender.
     # We keep the argument in deploy_contract for consistency, but the contract constructor will ignore it.
-    data_review_contract = deploy_contract("DataReview", data_review_abi, data_review_bytecode, token_contract.address, w3.eth.default_account) # Pass "DataReview"
-    print(f"DataReview deployed successfully at: {data_review_contract.address}")
-    print(f"DataReview owner: {data_review_contract.functions.owner().call()}")
-    time.sleep(1)
-
-    # 3. Deploy DataBundle contract, passing the deployed token's address AND the deployer as owner
-    print("\n[STEP 3/3] Deploying DataBundle contract...")
+    log.info("[STEP 2/2] Deploying DataReview and DataBundle contracts...")
+    data_review_abi, data_review_bytecode = load_contract_artifact("DataReview")
     data_bundle_abi, data_bundle_bytecode = load_contract_artifact("DataBundle")
-    # Pass token_contract.address and w3.eth.default_account (deployer) as initial owner for Ownable
-    # Note: For OZ 4.x, Ownable's constructor doesn't take _initialOwner. It defaults to msg.sender.
-    data_bundle_contract = deploy_contract("DataBundle", data_bundle_abi, data_bundle_bytecode, token_contract.address, w3.eth.default_account) # Pass "DataBundle"
-    print(f"DataBundle deployed successfully at: {data_bundle_contract.address}")
-    print(f"DataBundle owner: {data_bundle_contract.functions.owner().call()}")
-    time.sleep(1)
+    data_review_contract, data_bundle_contract = await asyncio.gather(
+        deploy_contract("DataReview", data_review_abi, data_review_bytecode, token_contract.address, w3.eth.default_account),
+        deploy_contract("DataBundle", data_bundle_abi, data_bundle_bytecode, token_contract.address, w3.eth.default_account),
+    )
+    log.info(f"DataReview deployed successfully at: {data_review_contract.address}")
+    log.info(f"DataBundle deployed successfully at: {data_bundle_contract.address}")
+    return token_contract, data_review_contract, data_bundle_contract
+
+async def deploy_with_factory(initial_supply):
+    """
+    Deploys MyToken, DataReview and DataBundle through the Deployer factory in a single transaction.
+    The contract addresses are decoded locally from the Deployed event in the receipt.
+    """
+    log.info("[STEP 1/1] Deploying MyToken, DataReview and DataBundle via the Deployer contract...")
+    deployer_abi, deployer_bytecode = load_contract_artifact("Deployer")
+    # The factory transfers the token supply and contract ownership to the deployer account
+    tx_receipt = await send_deployment("Deployer", deployer_abi, deployer_bytecode, initial_supply, w3.eth.default_account)
+    factory = contract_factory(deployer_abi, deployer_bytecode)(address=tx_receipt.contractAddress)
+    # The receipt also carries MyToken's Transfer and the OwnershipTransferred logs; skip them quietly
+    deployed = factory.events.Deployed().process_receipt(tx_receipt, errors=DISCARD)[0]['args']
+
+    token_contract = contract_factory(*load_contract_artifact("MyToken"))(address=deployed['token'])
+    data_review_contract = contract_factory(*load_contract_artifact("DataReview"))(address=deployed['dataReview'])
+    data_bundle_contract = contract_factory(*load_contract_artifact("DataBundle"))(address=deployed['dataBundle'])
+    log.info(f"MyToken deployed successfully at: {token_contract.address}")
+    log.info(f"DataReview deployed successfully at: {data_review_contract.address}")
+    log.info(f"DataBundle deployed successfully at: {data_bundle_contract.address}")
+    return token_contract, data_review_contract, data_bundle_contract
 
-    print("\n--- All Contracts Deployed Successfully! ---")
-    print(f"MyToken Address:    {token_contract.address}")
-    print(f"DataReview Address: {data_review_contract.address}")
-    print(f"DataBundle Address: {data_bundle_contract.address}")
+async def main(args):
+    global use_artifact_cache, use_gas_cache
+    use_artifact_cache = not args.no_cache
+    use_gas_cache = not args.fresh_gas
 
-    # Save deployed contract addresses to a JSON file for easy access by other scripts
+    # The single-transaction factory deployment is opt-in: it needs more gas than
+    # ganache-cli's default block gas limit (6,721,975) allows
+    use_factory = args.factory
+    contract_names = ["MyToken", "DataReview", "DataBundle"] + (["Deployer"] if use_factory else [])
+    # Read the build/ artifacts in a worker thread while the connection handshake is in flight.
+    # All artifacts are loaded in one thread so the caches are never written concurrently.
+    await asyncio.gather(
+        connect(use_http=args.http),
+        asyncio.to_thread(lambda: [load_contract_artifact(name) for name in contract_names]),
+    )
+    log.info("--- Starting Full Contract Deployment Process ---")
+
+    initial_supply = 1_000_000 * (10**18) # 1 Million tokens with 18 decimals
+    if use_factory:
+        token_contract, data_review_contract, data_bundle_contract = await deploy_with_factory(initial_supply)
+    else:
+        token_contract, data_review_contract, data_bundle_contract = await deploy_separately(initial_supply)
+
+    # Save deployed contract addresses to a JSON file for easy access by other scripts.
+    # The file is written in a worker thread while the verification batch below is in flight.
     contract_addresses = {
         'MyToken': token_contract.address,
         'DataReview': data_review_contract.address,
         'DataBundle': data_bundle_contract.address
     }
-    with open('contract_addresses.json', 'w') as f:
-        json.dump(contract_addresses, f, indent=4)
-    print("\nContract addresses saved to contract_addresses.json for future interactions.")
-    print("Deployment process finished.")
+    # Read back the deployed state in a single JSON-RPC batch instead of one round trip per getter
+    await asyncio.gather(
+        verify_deployment(token_contract, data_review_contract, data_bundle_contract),
+        asyncio.to_thread(atomic_write_json, 'contract_addresses.json', contract_addresses),
+    )
+
+    log.info("--- All Contracts Deployed Successfully! ---")
+    log.info(f"MyToken Address:    {token_contract.address}")
+    log.info(f"DataReview Address: {data_review_contract.address}")
+    log.info(f"DataBundle Address: {data_bundle_contract.address}")
+    log.info("Contract addresses saved to contract_addresses.json for future interactions.")
+    log.info("Deployment process finished.")
+    # Closes the WebSocket connection or the cached HTTP session
+    await w3.provider.disconnect()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Buffer log lines in memory and write them out in batches rather than one stdio write per line.
+    # Errors flush the buffer immediately, and anything left is flushed when the script exits.
+    # Only this script's logger is set to INFO; third-party loggers (web3, websockets) stay at the
+    # root logger's default WARNING level.
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+    log.addHandler(logging.handlers.MemoryHandler(capacity=1024, flushLevel=logging.ERROR, target=stream_handler))
+    log.setLevel(logging.INFO)
+    log.propagate = False
+    parser = argparse.ArgumentParser(description="Deploy the marketplace contracts to Ganache.")
+    parser.add_argument('--http', action='store_true', help="connect over HTTP instead of WebSocket")
+    parser.add_argument('--factory', action='store_true', help="deploy all contracts in one transaction via the Deployer contract (needs a block gas limit above ~8M, e.g. ganache-cli -l 30000000)")
+    parser.add_argument('--no-cache', action='store_true', help=f"ignore {ARTIFACT_CACHE_PATH} and re-read the build/ artifacts")
+    parser.add_argument('--fresh-gas', action='store_true', help=f"estimate gas for every deployment instead of reusing {GAS_CACHE_PATH}")
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except DeploymentError:
+        # Raised instead of calling exit() inside coroutines and worker threads, where SystemExit
+        # escapes through the event loop with a full traceback. The error is already logged.
+        sys.exit(1)
\ No newline at end of file
@@ -1,11 +1,15 @@
 from web3 import Web3
 import json
+import orjson
 import os
-import time
+import requests
+from requests.adapters import HTTPAdapter
 from web3.exceptions import ContractLogicError # Import the specific exception
 
-# Connect to Ganache
-w3 = Web3(Web3.HTTPProvider('http://127.0.0.1:8545'))
+# Connect to Ganache, reusing one pool of keep-alive connections for every RPC
+session = requests.Session()
+session.mount('http://', HTTPAdapter(pool_connections=32, pool_maxsize=32))
+w3 = Web3(Web3.HTTPProvider('http://127.0.0.1:8545', session=session, request_kwargs={'timeout': 30}))
 
 print(f"Connecting to Ganache at http://127.0.0.1:8545...")
 if not w3.is_connected():
@@ -49,11 +53,11 @@ def load_abi(contract_name):
         print("And then renamed the ABI files, e.g., 'mv build/contracts_MyToken_sol_MyToken.abi build/MyToken.json'")
         exit()
     try:
-        with open(abi_path, 'r') as f:
-            abi = json.load(f)
+        with open(abi_path, 'rb') as f:
+            abi = orjson.loads(f.read())
             print(f"SUCCESS: Loaded ABI for {contract_name}.")
             return abi
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         print(f"ERROR: Could not parse JSON from '{abi_path}'. Is it a valid JSON file?")
         exit()
 
@@ -126,7 +130,7 @@ def send_and_wait_for_transaction(contract_function, sender_account, description
 
         # Send transaction
         tx_hash = w3.eth.send_transaction(tx_object)
-        print(f"Transaction sent. Hash: {tx_hash.hex()}")
+        print(f"Transaction sent. Hash: {w3.to_hex(tx_hash)}")
         print("Waiting for transaction to be mined...")
 
         # Wait for receipt
@@ -135,11 +139,12 @@ def send_and_wait_for_transaction(contract_function, sender_account, description
 
         if tx_receipt.status == 0: # Transaction reverted
             # If it reverted here, but passed simulation, it's a deeper issue or race condition
-            print(f"!!! TRANSACTION FAILED (on-chain revert): {description}. Hash: {tx_hash.hex()}")
+            print(f"!!! TRANSACTION FAILED (on-chain revert): {description}. Hash: {w3.to_hex(tx_hash)}")
             print(f"Transaction receipt: {tx_receipt}")
             # Fallback to Ganache trace if direct ContractLogicError wasn't caught by .call()
             try:
-                trace = w3.manager.request_blocking("debug_traceTransaction", [tx_hash.hex()])
+                # Only returnValue is needed, so skip the per-step stack, memory and storage dumps
+                trace = w3.manager.request_blocking("debug_traceTransaction", [w3.to_hex(tx_hash), {'disableStack': True, 'disableMemory': True, 'disableStorage': True}])
                 if 'returnValue' in trace and trace['returnValue']:
                     revert_data = trace['returnValue']
                     if revert_data.startswith('0x08c379a0'): # Selector for Error(string)
@@ -192,7 +197,6 @@ def main():
         print(f"FAILED to distribute initial tokens: {e}")
         exit(1)
     print_balances(accounts)
-    time.sleep(2)
 
     print("\n--- STEP 2: DataReview System Demonstration ---")
 
@@ -211,7 +215,6 @@ def main():
         print(f"FAILED to submit dataset 1: {e}")
         exit(1)
     print_balances(accounts)
-    time.sleep(2)
 
     # 2.2 Reviewers stake tokens to be eligible
     reviewer_stake_amount = w3.to_wei(5, 'ether') # 5 MTK stake for reviewers
@@ -227,7 +230,6 @@ def main():
         print(f"FAILED for reviewers to stake: {e}")
         exit(1)
     print_balances(accounts)
-    time.sleep(2)
 
     # 2.3 Reviewers submit reviews for dataset_id_1
     try:
@@ -248,7 +250,6 @@ def main():
     print(f"Dataset {dataset_id_1} status: Reviewed={dataset1_info[4]}, Num Reviews={dataset1_info[6]}, Avg Score={dataset1_info[5] / dataset1_info[6] if dataset1_info[6] > 0 else 'N/A'}")
     print(f"Dataset {dataset_id_1} stake released status: {dataset1_info[7]}")
     print_balances(accounts)
-    time.sleep(2)
 
     # 2.4 Release dataset stake (should be automatically released after 3 reviews, but can be called manually too)
     if not dataset1_info[7]: # Check stakeReleased status
@@ -258,7 +259,6 @@ def main():
             print(f"FAILED to manually release dataset stake: {e}")
             # Not exiting here as it might be an expected failure if stake is already released by auto-trigger
     print_balances(accounts)
-    time.sleep(2)
 
     # 2.5 Reviewer withdraws stake
     try:
@@ -267,7 +267,6 @@ def main():
     except Exception as e:
         print(f"FAILED for reviewer to withdraw stake: {e}")
     print_balances(accounts)
-    time.sleep(2)
 
     # 2.6 Submit another dataset by dummy_dataset_owner for bundling later
     dataset_stake_amount_2 = w3.to_wei(8, 'ether')
@@ -281,7 +280,6 @@ def main():
         print(f"FAILED to submit dataset 2: {e}")
         exit(1)
     print_balances(accounts)
-    time.sleep(2)
 
     print("\n--- STEP 3: DataBundle System Demonstration ---")
 
@@ -294,7 +292,6 @@ def main():
     except Exception as e:
         print(f"FAILED to create bundle: {e}")
         exit(1)
-    time.sleep(1)
 
     # 3.2 Add datasets to the bundle with revenue-sharing weights
     dataset_weight_1 = 70 # Example weight for revenue sharing
@@ -309,7 +306,6 @@ def main():
         print(f"FAILED to add datasets to bundle: {e}")
         exit(1)
     print_balances(accounts)
-    time.sleep(2)
 
     # 3.3 Verify bundle datasets using the new getter
     print(f"\n--- Querying Bundle {bundle_id} Details ---")
@@ -322,7 +318,6 @@ def main():
     except Exception as e:
         print(f"FAILED to query bundle datasets: {e}")
     print("--- Bundle Details Query Complete ---\n")
-    time.sleep(1)
 
 
     # 3.4 Data Buyer purchases the bundle
@@ -336,7 +331,6 @@ def main():
         print(f"FAILED for data buyer to purchase bundle: {e}")
         exit(1)
     print_balances(accounts) # Observe changes in data_owner and dummy_dataset_owner balances
-    time.sleep(2)
 
     # 3.5 Verify bundle NFT ownership
     print(f"\n--- Verifying Bundle NFT Ownership ---")
@@ -0,0 +1,58 @@
+import asyncio
+import importlib.util
+import os
+
+import pytest
+
+pytest.importorskip("web3")
+web = pytest.importorskip("aiohttp.web")
+
+DEPLOY_PATH = os.path.join(os.path.dirname(__file__), "..", "scripts", "deploy.py")
+ACCOUNT = "0x" + "ab" * 20
+
+# Canned results for the JSON-RPC methods connect() sends
+RESPONSES = {
+    "eth_accounts": [ACCOUNT],
+    "eth_blockNumber": "0x5",
+    "eth_chainId": "0x539",
+    "web3_clientVersion": "EthereumJS TestRPC/v2.13.2/ethereum-js",
+}
+
+def load_deploy_module():
+    spec = importlib.util.spec_from_file_location("deploy", DEPLOY_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+async def run_connect_against_fake_node(deploy, received):
+    async def handle(request):
+        payload = await request.json()
+        received.append(payload)
+        def reply(req):
+            return {"jsonrpc": "2.0", "id": req["id"], "result": RESPONSES[req["method"]]}
+        return web.json_response([reply(req) for req in payload] if isinstance(payload, list) else reply(payload))
+
+    app = web.Application()
+    app.router.add_post("/", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    deploy.GANACHE_HTTP_URL = f"http://127.0.0.1:{port}"
+    try:
+        await deploy.connect(use_http=True)
+        await deploy.w3.provider.disconnect()
+    finally:
+        await runner.cleanup()
+
+def test_connect_sends_startup_probes_as_one_batch(monkeypatch):
+    monkeypatch.delenv("PRIVATE_KEY", raising=False)
+    deploy = load_deploy_module()
+    received = []
+    asyncio.run(run_connect_against_fake_node(deploy, received))
+
+    batches = [payload for payload in received if isinstance(payload, list)]
+    assert len(batches) == 1
+    assert [req["method"] for req in batches[0]] == ["eth_accounts", "eth_blockNumber", "eth_chainId"]
+    assert deploy.w3.eth.default_account.lower() == ACCOUNT
@@ -1,30 +1,34 @@
 from fastapi import FastAPI
-from fastapi.responses import FileResponse
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 import os
 
 app = FastAPI()
 
+# Compress responses (HTML, CSS, JS) for clients that accept gzip
+app.add_middleware(GZipMiddleware, minimum_size=500)
+
 # Define the directory where your static files (HTML, CSS, JS) are located
 STATIC_DIR = "visualisation"
 
 # Mount the  files directory
 app.mount("/visualisation", StaticFiles(directory=STATIC_DIR), name="visualisation")
 
-@app.get("/")
-async def read_root():
-    """
-    Serves the main HTML file when accessing the root URL ("/").
-    """
-    html_file_path = os.path.join(STATIC_DIR, "marketplace_visualiser.html")
-    return FileResponse(html_file_path, media_type="text/html")
+# Serve index.html at the root URL ("/"). StaticFiles sends ETag/Last-Modified headers
+# and answers conditional requests with 304 Not Modified.
+app.mount("/", StaticFiles(directory=STATIC_DIR, html=True), name="static")
 
 if __name__ == "__main__":
     import uvicorn
     # Run the FastAPI app using Uvicorn server
+    # Set DEV=1 for auto-reload during development; otherwise run one worker per CPU core
+    dev_mode = os.getenv("DEV") == "1"
     uvicorn.run(
         "visualise:app",  # 'visualise' is the filename without .py, 'app' is the FastAPI instance
         host="0.0.0.0",  # Allows external access
         port=8000,       # Standard port for FastAPI
-        reload=True      # Enable auto-reload during development
-    )
\ No newline at end of file
+        loop="uvloop",   # libuv-based event loop, faster than the default asyncio loop
+        http="httptools", # C-based HTTP parser
+        workers=1 if dev_mode else int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+        reload=dev_mode
+    )